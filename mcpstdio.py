@@ -28,9 +28,14 @@ from bs4 import BeautifulSoup
 # Create MCP server instance
 server = FastMCP(name="stdiomcp")
 
+# One client for the server's lifetime: keep-alive connections
+# are reused across calls, and an async tool doesn't block the
+# server's event loop while a slow page downloads.
+http_client = httpx.AsyncClient()
+
 
 @server.tool()
-def download_url(url: str) -> str:
+async def download_url(url: str) -> str:
     """
     Download a webpage and convert its content to markdown.
 
@@ -41,7 +46,7 @@ def download_url(url: str) -> str:
         Markdown content as a string
     """
     # Fetch the webpage content
-    response = httpx.get(url)
+    response = await http_client.get(url)
     response.raise_for_status()  # Raise an error for bad responses
 
     # Super-basic cleanup before passing to markdownify
@@ -64,9 +69,10 @@ def download_url(url: str) -> str:
         "meta",  # could contain refresh or redirect
     ]
     soup = BeautifulSoup(response.text, "html.parser")
-    for tag in simple_unsafe_tags:
-        for element in soup.find_all(tag):
-            element.decompose()
+    # find_all accepts a list, so one tree traversal strips all
+    # the tags rather than one walk per tag name.
+    for element in soup.find_all(simple_unsafe_tags):
+        element.decompose()
 
     # Convert HTML to markdown
 
@@ -1,4 +1,3 @@
-import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -46,22 +45,39 @@ class Config(BaseModel):
 
 class ConfigStore:
     _path: Path
+    _config: Optional[Config]
+    _mtime_ns: Optional[int]
 
     def __init__(self, path: Path):
         self._path = path
+        self._config = None
+        self._mtime_ns = None
 
     def save_config(self, config: Config):
         data = config.model_dump_json()
         with open(self._path, "w") as f:
             f.write(data)
+        self._config = config
+        self._mtime_ns = self._path.stat().st_mtime_ns
 
     def load_config(self) -> Config:
+        # Several UI elements load config on every rerun, so
+        # cache the parsed Config, invalidated on file mtime so
+        # edits made outside the app (eg, hand-editing the JSON)
+        # are still picked up.
         try:
-            with open(self._path, "r") as f:
-                data = json.load(f)
-                return Config(**data)
+            mtime_ns = self._path.stat().st_mtime_ns
         except FileNotFoundError:
             logger.warning(
                 "Couldn't load config from %s; loading default", self._path
             )
             return Config()  # Return default config if file doesn't exist
+        if self._config is not None and self._mtime_ns == mtime_ns:
+            return self._config
+        # model_validate_json parses JSON straight into the model
+        # in pydantic-core, skipping the intermediate dict.
+        self._config = Config.model_validate_json(
+            self._path.read_bytes()
+        )
+        self._mtime_ns = mtime_ns
+        return self._config
@@ -23,13 +23,12 @@ from anthropic.types import (
 
 from rapport.chatmodel import (
     MessageList,
-    SystemMessage,
     ToolCallMessage,
 )
 from rapport.tools import Tool
 
+from .common import encode_image, shared_http_client
 from .types import (
-    BadImageFormat,
     ChatAdaptor,
     FinishReason,
     MessageChunk,
@@ -56,16 +55,17 @@ class AnthropicAdaptor(ChatAdaptor):
         the chat.
         """
 
-        sys_str = "\n\n".join(
-            [m.message for m in messages if isinstance(m, SystemMessage)]
-        )
-        system_prompt = [TextBlockParam(text=sys_str, type="text")]
-
+        # Single pass: collect system prompt parts alongside the
+        # chat messages rather than walking the history twice.
+        sys_parts = []
         output = []
+        doc_params: List[DocumentBlockParam] = []
 
         for m in messages:
             mp = None
             match m.type:
+                case "SystemMessage":
+                    sys_parts.append(m.message)
                 case "UserMessage":
                     mp = MessageParam(
                         role="user",
@@ -88,6 +88,7 @@ class AnthropicAdaptor(ChatAdaptor):
                     )
                 case "IncludedFile":
                     p = self._prepare_documentblockparam(m.data)
+                    doc_params.append(p)
                     mp = MessageParam(
                         role="user",
                         content=[p],
@@ -126,6 +127,26 @@ class AnthropicAdaptor(ChatAdaptor):
             if mp:
                 output.append(mp)
 
+        # Cache the stable prefix, not just the final user turn:
+        # Anthropic allows at most four cache breakpoints per
+        # request, so spend one on the system prompt, up to two
+        # on the most recent included documents (usually the bulk
+        # of the prompt), and keep one for the last user message
+        # below.
+        system_prompt = [
+            TextBlockParam(
+                text="\n\n".join(sys_parts),
+                type="text",
+                cache_control=CacheControlEphemeralParam(
+                    type="ephemeral"
+                ),
+            )
+        ]
+        for p in doc_params[-2:]:
+            p["cache_control"] = CacheControlEphemeralParam(
+                type="ephemeral"
+            )
+
         # If last message is user, apply prompt caching
         match output[-1]:
             case {"role": "user", "content": [c]}:
@@ -149,23 +170,7 @@ class AnthropicAdaptor(ChatAdaptor):
 
     def _prepare_imageblockparam(self, image_path: Path) -> ImageBlockParam:
         """Convert image to base64 for Anthropic API"""
-        import base64
-
-        with open(image_path, "rb") as img_file:
-            base64_image = base64.b64encode(img_file.read()).decode("utf-8")
-
-        match image_path.suffix.lower():
-            case ".png":
-                mime_type = "image/png"
-            case ".gif":
-                mime_type = "image/gif"
-            case ".webp":
-                mime_type = "image/webp"
-            case ".jpg" | ".jpeg":
-                mime_type = "image/jpeg"
-            case other:
-                raise BadImageFormat(other)
-
+        mime_type, base64_image = encode_image(image_path)
         return ImageBlockParam(
             type="image",
             source=Base64ImageSourceParam(
@@ -186,7 +191,7 @@ class AnthropicAdaptor(ChatAdaptor):
             "claude-3-5-sonnet-latest",
             "claude-3-5-haiku-latest",
         ]
-        self.c = Anthropic()
+        self.c = Anthropic(http_client=shared_http_client)
 
     def list(self) -> List[str]:
         return self.models
@@ -275,6 +280,15 @@ class AnthropicAdaptor(ChatAdaptor):
                             pass  # should be the last message
                         case _:
                             print(event)
+                    # Meta events (ping, block start/stop, ...) set
+                    # nothing; skip the generator round-trip rather
+                    # than yielding an empty chunk for them.
+                    if (
+                        input_tokens is None
+                        and output_tokens is None
+                        and finish_reason is None
+                    ):
+                        continue
                     yield MessageChunk(
                         content="",
                         input_tokens=input_tokens,
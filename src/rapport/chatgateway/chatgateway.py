@@ -1,5 +1,10 @@
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
+    Callable,
     Dict,
     Generator,
     List,
@@ -10,19 +15,88 @@ from rapport.chatmodel import (
 )
 from rapport.tools import Tool
 
-from .anthropic import AnthropicAdaptor
-from .ollama import OllamaAdaptor
-from .openai import OpenAIAdaptor
 from .types import (
     ChatAdaptor,
     MessageChunk,
     MissingEnvVarException,
 )
-from .watsonx import WatsonxAdaptor
 
 logger = logging.getLogger(__name__)
 
 
+def _coalesce(
+    chunks: Generator[MessageChunk, None, None],
+    max_ms: float = 16.0,
+    max_chars: int = 64,
+) -> Generator[MessageChunk, None, None]:
+    """
+    Merge small content-only chunks into fewer, larger ones.
+
+    Fast providers emit a MessageChunk per SSE delta, and every
+    yield costs a dataclass build plus a generator round-trip in
+    the consumer. Buffer content until max_chars accumulate or
+    max_ms elapse; chunks carrying metadata (token counts, finish
+    reason, tool calls) flush the buffer into themselves and pass
+    through immediately so nothing is delayed or reordered.
+    """
+    buf: List[str] = []
+    buf_len = 0
+    deadline = 0.0
+    for chunk in chunks:
+        if (
+            chunk.input_tokens is not None
+            or chunk.output_tokens is not None
+            or chunk.finish_reason is not None
+            or chunk.tool_call is not None
+        ):
+            if buf:
+                buf.append(chunk.content)
+                chunk.content = "".join(buf)
+                buf = []
+                buf_len = 0
+            yield chunk
+            continue
+        if not buf:
+            deadline = time.monotonic() + max_ms / 1000.0
+        buf.append(chunk.content)
+        buf_len += len(chunk.content)
+        if buf_len >= max_chars or time.monotonic() >= deadline:
+            yield MessageChunk(
+                content="".join(buf),
+                input_tokens=None,
+                output_tokens=None,
+                finish_reason=None,
+                tool_call=None,
+            )
+            buf = []
+            buf_len = 0
+    if buf:
+        yield MessageChunk(
+            content="".join(buf),
+            input_tokens=None,
+            output_tokens=None,
+            finish_reason=None,
+            tool_call=None,
+        )
+
+
+def _prewarm(fn: Callable[[], object]) -> None:
+    """
+    Run a cheap request on a daemon thread so the adaptor's HTTPS
+    connection is already open (DNS+TCP+TLS done) by the time the
+    user sends their first message. Failures don't matter; the
+    real request will surface any error.
+    """
+
+    def run():
+        try:
+            fn()
+        except Exception as ex:
+            logger.debug("Connection pre-warm failed: %s", ex)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
 class ChatGateway:
     models: List[str]
     model_to_client: Dict[str, ChatAdaptor]
@@ -32,37 +106,73 @@ class ChatGateway:
         self.models = []
         self.model_to_client = {}
 
-        try:
-            oa = OllamaAdaptor()
-            self.models.extend(oa.list())
-            for m in oa.list():
-                self.model_to_client[m] = oa
-        except ConnectionError:
-            logger.info("Ollama not running; cannot use ollama models")
+        # Adaptor modules are imported inside the factories so we
+        # only pay for a provider's SDK (anthropic, openai and
+        # ibm_watsonx_ai are each slow imports) when that provider
+        # is actually configured. Env vars are checked before the
+        # import for the same reason.
+        def ollama() -> ChatAdaptor:
+            from .ollama import OllamaAdaptor
+
+            return OllamaAdaptor()
+
+        def anthropic() -> ChatAdaptor:
+            if not os.environ.get("ANTHROPIC_API_KEY"):
+                raise MissingEnvVarException("ANTHROPIC_API_KEY")
+            from .anthropic import AnthropicAdaptor
 
-        try:
             aa = AnthropicAdaptor()
-            self.models.extend(aa.list())
-            for m in aa.list():
-                self.model_to_client[m] = aa
-        except MissingEnvVarException as ex:
-            logger.info(f"Warning: {ex}; cannot use Anthropic models")
+            _prewarm(aa.c.models.list)
+            return aa
+
+        def watsonx() -> ChatAdaptor:
+            for var in [
+                "WATSONX_IAM_API_KEY",
+                "WATSONX_PROJECT",
+                "WATSONX_URL",
+            ]:
+                if not os.environ.get(var):
+                    raise MissingEnvVarException(var)
+            from .watsonx import WatsonxAdaptor
 
-        try:
             wa = WatsonxAdaptor()
-            self.models.extend(wa.list())
-            for m in wa.list():
-                self.model_to_client[m] = wa
-        except MissingEnvVarException as ex:
-            logger.info(f"Warning: {ex}; cannot use watsonx models")
+            _prewarm(wa._client)
+            return wa
 
-        try:
-            oa = OpenAIAdaptor()
-            self.models.extend(oa.list())
-            for m in oa.list():
-                self.model_to_client[m] = oa
-        except MissingEnvVarException as ex:
-            logger.info(f"Warning: {ex}; cannot use OpenAI models")
+        def openai() -> ChatAdaptor:
+            if not os.environ.get("OPENAI_API_KEY"):
+                raise MissingEnvVarException("OPENAI_API_KEY")
+            from .openai import OpenAIAdaptor
+
+            return OpenAIAdaptor()
+
+        # Construct adaptors concurrently: Ollama pings localhost
+        # and watsonx may talk to IBM Cloud, so building serially
+        # gates startup on the sum of provider latencies rather
+        # than the slowest one.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                (pool.submit(ollama), "Ollama"),
+                (pool.submit(anthropic), "Anthropic"),
+                (pool.submit(watsonx), "watsonx"),
+                (pool.submit(openai), "OpenAI"),
+            ]
+            # Collect in submission order so self.models keeps a
+            # stable ordering (the default model is models[0]).
+            for future, name in futures:
+                try:
+                    adaptor = future.result()
+                except ConnectionError:
+                    logger.info(
+                        "Ollama not running; cannot use ollama models"
+                    )
+                    continue
+                except MissingEnvVarException as ex:
+                    logger.info(f"Warning: {ex}; cannot use {name} models")
+                    continue
+                ms = adaptor.list()
+                self.models.extend(ms)
+                self.model_to_client.update({m: adaptor for m in ms})
 
     def list(self) -> List[str]:
         return self.models
@@ -72,6 +182,18 @@ class ChatGateway:
         c = self.model_to_client[model]
         return c.supports_images(model)
 
+    def warm(self, model: str):
+        """
+        Ask the adaptor serving model to preload it, if the
+        adaptor supports that (currently Ollama, where loading
+        the model dominates first-token latency). Returns
+        immediately; warming happens in the background.
+        """
+        c = self.model_to_client.get(model)
+        warm = getattr(c, "warm", None)
+        if warm:
+            warm(model)
+
     def chat(
         self,
         model: str,
@@ -84,5 +206,4 @@ class ChatGateway:
             messages=messages,
             tools=tools,
         )
-        for chunk in response:
-            yield chunk
+        yield from _coalesce(response)
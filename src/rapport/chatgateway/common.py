@@ -1,9 +1,17 @@
+import atexit
+import base64
 import logging
+import mmap
+from functools import lru_cache
+from pathlib import Path
 from typing import (
     Dict,
     List,
+    Tuple,
 )
 
+import httpx
+
 from rapport.chatmodel import (
     AssistantMessage,
     IncludedFile,
@@ -12,9 +20,120 @@ from rapport.chatmodel import (
     UserMessage,
 )
 
+from .types import BadImageFormat
+
 
 logger = logging.getLogger(__name__)
 
+_MIME_TYPES = {
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+
+# A single pooled HTTP client, shared by adaptors whose SDKs accept
+# an injected httpx.Client. Sharing the pool means keep-alive
+# connections survive across ChatGateway constructions, so later
+# sessions skip the TCP+TLS handshake on their first request.
+# HTTP/2 lets concurrent streaming requests multiplex over one
+# TLS connection rather than opening one connection per stream.
+http_limits = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+http_timeout = httpx.Timeout(120.0, connect=10.0)
+shared_http_client = httpx.Client(
+    http2=True,
+    limits=http_limits,
+    timeout=http_timeout,
+)
+atexit.register(shared_http_client.close)
+
+
+def encode_image(image_path: Path) -> Tuple[str, str]:
+    """
+    Return (mime_type, base64_data) for an image file.
+
+    Cached on (path, mtime, size): every turn of a conversation
+    re-prepares its images, so without the cache the same file is
+    base64-encoded on every request.
+    Raises BadImageFormat for unsupported extensions.
+    """
+    st = image_path.stat()
+    return _encode_image(str(image_path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _encode_image(path: str, mtime_ns: int, size: int) -> Tuple[str, str]:
+    suffix = Path(path).suffix.lower()
+    mime_type = _MIME_TYPES.get(suffix)
+    if mime_type is None:
+        raise BadImageFormat(suffix)
+
+    # b64encode over an mmap view skips materialising the raw
+    # file bytes in Python, so peak memory is the encoded output
+    # rather than raw + encoded copies.
+    with open(path, "rb") as img_file:
+        with mmap.mmap(
+            img_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            return mime_type, base64.b64encode(mm).decode("ascii")
+
+
+def _estimate_tokens(m) -> int:
+    """Rough token count for a message (~4 chars per token)"""
+    match m.type:
+        case "IncludedFile":
+            text = m.data
+        case "ToolCallMessage":
+            text = str(m.parameters)
+        case "ToolResultMessage":
+            text = m.result
+        case "IncludedImage":
+            return 0  # not sent by text-only adaptors
+        case _:
+            text = m.message
+    return len(text) // 4 + 1
+
+
+def prune_messages(
+    messages: MessageList, budget_tokens: int
+) -> MessageList:
+    """
+    Trim a chat history to roughly budget_tokens, keeping all
+    system messages and as many of the most recent messages as
+    fit (always at least the latest). Sending the full history
+    every turn otherwise makes prefill time and token cost grow
+    with conversation length, and models with small contexts
+    silently lose the head of the prompt anyway.
+    """
+    system = [m for m in messages if isinstance(m, SystemMessage)]
+    budget = budget_tokens - sum(_estimate_tokens(m) for m in system)
+
+    kept = []
+    for m in reversed(messages):
+        if isinstance(m, SystemMessage):
+            continue
+        cost = _estimate_tokens(m)
+        if kept and cost > budget:
+            break
+        budget -= cost
+        kept.append(m)
+    kept.reverse()
+
+    if len(kept) + len(system) < len(messages):
+        logger.info(
+            "Pruned chat history to %d of %d messages (~%d tokens)",
+            len(kept) + len(system),
+            len(messages),
+            budget_tokens,
+        )
+    return system + kept
+
 
 def prepare_messages_for_model(
     messages: MessageList,
@@ -32,26 +151,27 @@ def prepare_messages_for_model(
     # - Files
     # - Chat
     # System and files for context, chat for the task
-    result: List[Dict[str, str]] = []
+    # Partition in a single pass over the history rather than
+    # one isinstance scan per bucket.
+    system: List[Dict[str, str]] = []
+    file: List[Dict[str, str]] = []
+    chat: List[Dict[str, str]] = []
 
-    system = [m for m in messages if isinstance(m, SystemMessage)]
-    file = [m for m in messages if isinstance(m, IncludedFile)]
-    chat = [
-        m
-        for m in messages
-        if isinstance(m, AssistantMessage) or isinstance(m, UserMessage)
-    ]
-
-    result.extend([{"role": m.role, "content": m.message} for m in system])
-    for m in file:
-        # This format seems to work well for models without
-        # a specific document type in their API.
-        prompt = f"""
+    for m in messages:
+        match m:
+            case SystemMessage():
+                system.append({"role": m.role, "content": m.message})
+            case IncludedFile():
+                # This format seems to work well for models without
+                # a specific document type in their API.
+                prompt = f"""
         `{m.name}`
         ---
         {m.data}
 
         ---"""
-        result.append({"role": m.role, "content": prompt})
-    result.extend([{"role": m.role, "content": m.message} for m in chat])
-    return result
+                file.append({"role": m.role, "content": prompt})
+            case AssistantMessage() | UserMessage():
+                chat.append({"role": m.role, "content": m.message})
+
+    return system + file + chat
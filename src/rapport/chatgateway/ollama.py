@@ -1,5 +1,7 @@
 import logging
+import threading
 from typing import (
+    Dict,
     Generator,
     List,
     Optional,
@@ -13,7 +15,9 @@ from rapport.chatmodel import (
 from rapport.tools import Tool
 
 from .common import (
+    http_limits,
     prepare_messages_for_model,
+    prune_messages,
 )
 from .types import ChatAdaptor, FinishReason, MessageChunk, ModelInfo
 
@@ -26,8 +30,12 @@ class OllamaAdaptor(ChatAdaptor):
 
     def __init__(self):
         self.models = []
+        self._show_cache: Dict[str, Optional[ModelInfo]] = {}
 
-        self.c = ollama.Client()
+        # ollama.Client builds its own httpx.Client, so we can't
+        # share ours, but we can at least apply the same pool
+        # tuning so keep-alive connections are retained.
+        self.c = ollama.Client(limits=http_limits)
         ollama_models = [model["model"] for model in self.c.list()["models"]]
         self.models.extend(ollama_models)
 
@@ -37,14 +45,35 @@ class OllamaAdaptor(ChatAdaptor):
     def supports_images(self, model: str) -> bool:
         return False
 
+    def warm(self, model: str):
+        """
+        Load model into memory in the background so the first
+        prompt doesn't stall on model load. A zero-prompt
+        generate is Ollama's documented preload idiom.
+        """
+
+        def _load():
+            try:
+                self.c.generate(model=model, prompt="", keep_alive="1h")
+            except Exception as ex:
+                logger.debug("Warm of %s failed: %s", model, ex)
+
+        threading.Thread(target=_load, daemon=True).start()
+
     def _show(self, model: str) -> Optional[ModelInfo]:
+        # Model info is stable for the process lifetime, so cache
+        # it; this otherwise costs an HTTP round-trip per turn.
+        if model in self._show_cache:
+            return self._show_cache[model]
         m = self.c.show(model)
         if m and m.modelinfo and m.details:
-            return ModelInfo(
+            info = ModelInfo(
                 model, m.modelinfo[f"{m.details.family}.context_length"]
             )
         else:
-            return None
+            info = None
+        self._show_cache[model] = info
+        return info
 
     def chat(
         self,
@@ -52,7 +81,6 @@ class OllamaAdaptor(ChatAdaptor):
         messages: MessageList,
         tools: List[Tool],
     ) -> Generator[MessageChunk, None, None]:
-        messages_content = prepare_messages_for_model(messages)
         m = self._show(model)
         if m is None:
             logger.error("Ollama chat got unknown model: %s", model)
@@ -60,28 +88,37 @@ class OllamaAdaptor(ChatAdaptor):
         # Truncate the context length to reduce memory usage
         # TODO make this an option?
         num_ctx = min(2048, m.context_length)
+        # Keep the history within the context window ourselves;
+        # otherwise Ollama silently drops the head of the prompt
+        # (including the system message) and prefill cost grows
+        # with every turn.
+        messages = prune_messages(messages, num_ctx)
+        messages_content = prepare_messages_for_model(messages)
 
         response = self.c.chat(
             model=model,
             messages=messages_content,
             stream=True,
+            # Keep the model (and its KV cache) resident between
+            # turns; the default 5m unload forces a full reload +
+            # re-prefill mid-conversation.
+            keep_alive="1h",
             options=ollama.Options(
                 num_ctx=num_ctx,
             ),
         )
+        # This loop runs once per token: use plain attribute access
+        # on the response model rather than dict-style lookups.
+        _stop = FinishReason.Stop
         for chunk in response:
-            finish_reason = None
-            input_tokens = None
-            output_tokens = None
-            if chunk.get("done", False):
-                finish_reason = FinishReason.Stop
-            if chunk.prompt_eval_count and chunk.eval_count:
-                input_tokens = chunk.prompt_eval_count
-                output_tokens = chunk.eval_count
+            input_tokens = chunk.prompt_eval_count
+            output_tokens = chunk.eval_count
+            if not (input_tokens and output_tokens):
+                input_tokens = output_tokens = None
             yield MessageChunk(
-                content=chunk["message"]["content"],
+                content=chunk.message.content or "",
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
-                finish_reason=finish_reason,
+                finish_reason=_stop if chunk.done else None,
                 tool_call=None,
             )
@@ -3,7 +3,6 @@ import os
 from pathlib import Path
 from typing import (
     Generator,
-    Iterable,
     List,
     cast,
 )
@@ -19,12 +18,11 @@ from openai.types.chat import (
 
 from rapport.chatmodel import (
     MessageList,
-    SystemMessage,
 )
 from rapport.tools import Tool
 
+from .common import encode_image, shared_http_client
 from .types import (
-    BadImageFormat,
     ChatAdaptor,
     FinishReason,
     MessageChunk,
@@ -33,6 +31,11 @@ from .types import (
 
 logger = logging.getLogger(__name__)
 
+_FINISH_REASONS = {
+    "stop": FinishReason.Stop,
+    "length": FinishReason.Length,
+}
+
 
 class OpenAIAdaptor(ChatAdaptor):
     models: List[str]
@@ -44,7 +47,10 @@ class OpenAIAdaptor(ChatAdaptor):
         if not os.environ.get("OPENAI_API_KEY"):
             raise MissingEnvVarException("OPENAI_API_KEY")
 
-        self.c = openai.Client(api_key=os.environ["OPENAI_API_KEY"])
+        self.c = openai.Client(
+            api_key=os.environ["OPENAI_API_KEY"],
+            http_client=shared_http_client,
+        )
         self.models.extend(
             [
                 "gpt-4.1",
@@ -79,21 +85,20 @@ class OpenAIAdaptor(ChatAdaptor):
             messages=messages_content,
         )
 
+        # This loop runs once per streamed token. We don't set
+        # n>1, so each chunk carries exactly one choice; read it
+        # directly rather than building a list + join per chunk.
         for event in completion:
             event = cast(ChatCompletionChunk, event)
+            if not event.choices:
+                continue  # eg, a trailing usage-only frame
+            choice = event.choices[0]
+            content = choice.delta.content or ""
             finish_reason = None
-            content = "".join(
-                [x.delta.content for x in event.choices if x.delta.content]
-            )
-            match event.choices[0].finish_reason:
-                case "stop":
-                    finish_reason = FinishReason.Stop
-                case "length":
-                    finish_reason = FinishReason.Length
-                case None:
-                    finish_reason = None
-                case _:
-                    finish_reason = FinishReason.Other
+            if choice.finish_reason is not None:
+                finish_reason = _FINISH_REASONS.get(
+                    choice.finish_reason, FinishReason.Other
+                )
 
             yield MessageChunk(
                 content=content,
@@ -106,7 +111,7 @@ class OpenAIAdaptor(ChatAdaptor):
     def _prepare_messages_for_model(
         self,
         messages: MessageList,
-    ) -> Iterable[ChatCompletionMessageParam]:
+    ) -> List[ChatCompletionMessageParam]:
         """
         Converts message history format into format for model.
 
@@ -120,20 +125,15 @@ class OpenAIAdaptor(ChatAdaptor):
         # - Files
         # - Chat
         # System and files for context, chat for the task
-        result: Iterable[ChatCompletionMessageParam] = []
+        # One pass: system parts are collected alongside the rest
+        # of the history rather than via separate scans.
+        sys_parts: List[str] = []
+        result: List[ChatCompletionMessageParam] = []
 
-        system_prompt = "\n\n".join(
-            [m.message for m in messages if isinstance(m, SystemMessage)]
-        )
-        result.append(
-            ChatCompletionSystemMessageParam(
-                role="system", content=system_prompt
-            )
-        )
-
-        remaining = [m for m in messages if not isinstance(m, SystemMessage)]
-        for m in remaining:
+        for m in messages:
             match m.type:
+                case "SystemMessage":
+                    sys_parts.append(m.message)
                 case "UserMessage":
                     x = ChatCompletionUserMessageParam(
                         role="user", content=m.message
@@ -160,29 +160,19 @@ class OpenAIAdaptor(ChatAdaptor):
                 case "IncludedImage":
                     result.append(self._prepare_imageblockparam(m.path))
 
+        result.insert(
+            0,
+            ChatCompletionSystemMessageParam(
+                role="system", content="\n\n".join(sys_parts)
+            ),
+        )
         return result
 
     def _prepare_imageblockparam(
         self, image_path: Path
     ) -> ChatCompletionUserMessageParam:
-        """Convert image to base64 for Anthropic API"""
-        import base64
-
-        with open(image_path, "rb") as img_file:
-            base64_image = base64.b64encode(img_file.read()).decode("utf-8")
-
-        match image_path.suffix.lower():
-            case ".png":
-                mime_type = "image/png"
-            case ".gif":
-                mime_type = "image/gif"
-            case ".webp":
-                mime_type = "image/webp"
-            case ".jpg" | ".jpeg":
-                mime_type = "image/jpeg"
-            case other:
-                raise BadImageFormat(other)
-
+        """Convert image to base64 for the OpenAI API"""
+        mime_type, base64_image = encode_image(image_path)
         return {
             "role": "user",
             "content": [
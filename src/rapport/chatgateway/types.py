@@ -30,7 +30,9 @@ class ModelInfo:
     context_length: int
 
 
-@dataclass
+# slots: one of these is allocated per streamed token, so skip
+# the per-instance __dict__ to cut allocation and GC pressure.
+@dataclass(slots=True)
 class MessageChunk:
     input_tokens: Optional[int]
     output_tokens: Optional[int]
@@ -27,6 +27,11 @@ from .types import (
 
 logger = logging.getLogger(__name__)
 
+_FINISH_REASONS = {
+    "stop": FinishReason.Stop,
+    "length": FinishReason.Length,
+}
+
 
 class WatsonxAdaptor(ChatAdaptor):
     c: Optional[wai.APIClient]
@@ -117,18 +122,20 @@ class WatsonxAdaptor(ChatAdaptor):
                 finish_reason = None
                 if ch := chunk.get("choices"):
                     content = ch[0]["delta"].get("content", "")
-                    match ch[0]["finish_reason"]:
-                        case "stop":
-                            finish_reason = FinishReason.Stop
-                        case "length":
-                            finish_reason = FinishReason.Length
-                        case None:
-                            finish_reason = None
-                        case _:
-                            finish_reason = FinishReason.Other
+                    if (fr := ch[0]["finish_reason"]) is not None:
+                        finish_reason = _FINISH_REASONS.get(
+                            fr, FinishReason.Other
+                        )
                 if chunk.get("usage"):
                     input_tokens = chunk["usage"]["total_tokens"]
                     output_tokens = 0  # TODO fix this per watsonx schema
+                # Skip chunks that carry nothing for the caller.
+                if (
+                    not content
+                    and input_tokens is None
+                    and finish_reason is None
+                ):
+                    continue
                 mc = MessageChunk(
                     content=content,
                     input_tokens=input_tokens,
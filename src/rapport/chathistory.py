@@ -1,6 +1,13 @@
+import atexit
+import hashlib
 import io
 import json
 import logging
+import os
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -10,6 +17,7 @@ from PIL.Image import Resampling
 
 from rapport.chatmodel import (
     Chat,
+    IncludedFile,
 )
 
 logger = logging.getLogger(__name__)
@@ -24,104 +32,498 @@ class ChatHistoryStore:
         self.images_dir = base_dir / "images"
         self.images_dir.mkdir(exist_ok=True, parents=True)
 
-        # Create an index file to track chat metadata
-        self.index_path = base_dir / "chat_index.json"
-        if not self.index_path.exists():
-            self._save_index({})
-
-        self.clear_old_chats()  # clear on startup
-
-    def _save_index(self, index: Dict):
-        """Save the chat index file"""
-        with open(self.index_path, "w") as f:
-            json.dump(index, f, indent=2)
+        # Large IncludedFile payloads are stored out-of-band here,
+        # keyed by content hash, so chat JSON stays small and the
+        # same file included in many chats is stored once.
+        self.blobs_dir = base_dir / "blobs"
+        self.blobs_dir.mkdir(exist_ok=True, parents=True)
+
+        # Chat metadata lives in a small SQLite index so saves are
+        # a single UPSERT rather than a full rewrite of a JSON file.
+        # Streamlit runs scripts on worker threads, so allow the
+        # connection to cross threads and serialise access ourselves.
+        self.db_path = base_dir / "chat_index.db"
+        self.db = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        # Row supports mapping access without allocating a dict
+        # per row in Python for every query.
+        self.db.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("PRAGMA temp_store=MEMORY")
+            self.db.execute("PRAGMA wal_autocheckpoint=1000")
+            # Serve warm reads straight from the OS page cache and
+            # give SQLite a little more room (64MB) than its 2MB
+            # default page cache; the index is tiny, so these are
+            # caps rather than reservations.
+            self.db.execute("PRAGMA mmap_size=268435456")
+            self.db.execute("PRAGMA cache_size=-64000")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS chats (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    created_at TEXT,
+                    model TEXT,
+                    updated_at TEXT,
+                    export_location TEXT,
+                    input_tokens INTEGER,
+                    output_tokens INTEGER,
+                    message_count INTEGER
+                )
+                """)
+            self._ensure_columns()
+            # Full-text index over user/assistant message text,
+            # maintained by save_chat/delete_chat; rank-ordered
+            # search beats a linear scan of every chat file.
+            self.db.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS chats_fts
+                USING fts5(chat_id UNINDEXED, content)
+                """)
+            # Recency listings order by updated_at and the purge
+            # filters on created_at; indexes give both a range
+            # scan instead of a sort of every row.
+            self.db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_chats_created_at
+                ON chats(created_at DESC)
+                """)
+            self.db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_chats_updated_at
+                ON chats(updated_at DESC)
+                """)
+        self._migrate_json_index(base_dir / "chat_index.json")
+
+        # Chat files are written on a single background worker so
+        # the Streamlit script thread isn't stalled by disk I/O;
+        # one worker keeps writes for a chat in order.
+        self._writer = ThreadPoolExecutor(max_workers=1)
+
+        # State for schedule_save's debouncing.
+        self._pending_chat: Optional[Chat] = None
+        self._pending_timer: Optional[threading.Timer] = None
+        self._pending_lock = threading.Lock()
+
+        # Serializes save_chat end to end. A debounce timer that
+        # has already popped the pending chat can race a direct
+        # save of the same chat; without this lock both read the
+        # same persisted message_count and enqueue the same lines
+        # twice, duplicating messages in the JSONL file.
+        self._save_lock = threading.Lock()
+
+        # Flush any debounced save and drain the writer on exit so
+        # an in-flight chat write isn't lost at shutdown.
+        atexit.register(self.flush)
+
+        # Sweep expired chats off the startup path; on an aged
+        # install the unlinks would otherwise gate first paint.
+        threading.Thread(
+            target=self.clear_old_chats, daemon=True
+        ).start()
+
+    def _ensure_columns(self):
+        """
+        Bring a chats table created by an older version up to the
+        current schema. ALTER TABLE ADD COLUMN is cheap in SQLite
+        (a catalogue update, not a table rewrite).
+        Caller holds _db_lock.
+        """
+        cols = {
+            r[1] for r in self.db.execute("PRAGMA table_info(chats)")
+        }
+        for name, decl in [
+            ("updated_at", "TEXT"),
+            ("export_location", "TEXT"),
+            ("input_tokens", "INTEGER"),
+            ("output_tokens", "INTEGER"),
+            ("message_count", "INTEGER"),
+        ]:
+            if name not in cols:
+                self.db.execute(
+                    f"ALTER TABLE chats ADD COLUMN {name} {decl}"
+                )
+        # Rows from before updated_at existed sort with the
+        # recency queries below once backfilled.
+        self.db.execute(
+            """
+            UPDATE chats SET updated_at = created_at
+            WHERE updated_at IS NULL
+            """
+        )
 
-    def _load_index(self) -> Dict:
-        """Load the chat index file"""
+    def _migrate_json_index(self, index_path: Path):
+        """One-time import of the old chat_index.json into SQLite"""
         try:
-            with open(self.index_path, "r") as f:
-                return json.load(f)
+            with open(index_path, "r") as f:
+                index = json.load(f)
         except FileNotFoundError:
-            return {}
-
-    def _generate_chat_id(self) -> str:
-        """Generate a unique chat ID based on timestamp"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+            return
+        with self._db_lock:
+            # updated_at is load-bearing (recency listings and the
+            # History page's month grouping); the old index never
+            # had it, so seed it from created_at. This runs after
+            # _ensure_columns' backfill, which can't help here.
+            self.db.executemany(
+                """
+                INSERT OR REPLACE INTO chats
+                (id, title, created_at, model, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        k,
+                        v["title"],
+                        v["created_at"],
+                        v.get("model"),
+                        v["created_at"],
+                    )
+                    for k, v in index.items()
+                ],
+            )
+        index_path.rename(index_path.with_suffix(".json.bak"))
+        logger.info("Migrated %s into %s", index_path, self.db_path)
+
+    def schedule_save(self, chat: Chat):
+        """
+        Debounced save_chat: coalesces bursts of saves (eg, during
+        a streamed response) into at most one write per second.
+        Use save_chat directly for the final write of a turn.
+        """
+        with self._pending_lock:
+            self._pending_chat = chat
+            if self._pending_timer is None:
+                t = threading.Timer(1.0, self._flush_scheduled)
+                t.daemon = True
+                t.start()
+                self._pending_timer = t
+
+    def _flush_scheduled(self):
+        with self._pending_lock:
+            chat = self._pending_chat
+            self._pending_chat = None
+            self._pending_timer = None
+        if chat is not None:
+            self.save_chat(chat)
+
+    def flush(self):
+        """Write any pending debounced save and wait for queued
+        file writes to hit disk."""
+        self._flush_scheduled()
+        try:
+            # A sentinel job: the single worker runs jobs in
+            # order, so when this returns everything queued
+            # before it is done.
+            self._writer.submit(lambda: None).result()
+        except RuntimeError:
+            # Interpreter is exiting: executors stop accepting
+            # work before atexit callbacks run, but their queued
+            # jobs have already been drained by then.
+            pass
 
     def save_chat(
         self,
         chat: Chat,
     ):
         """
-        Save a chat session to a JSON file.
+        Save a chat session: metadata to the index, messages to
+        the chat's JSONL file.
         If chat_id is already saved, update existing chat.
         If not already saved, create a new chat.
         """
-        # Save chat to individual JSON file
-        chat_path = self.chats_dir / f"{chat.id}.json"
-        with open(chat_path, "w") as f:
-            # Use Pydantic's model_dump with mode='json' for serialization
-            chat_json = chat.model_dump(mode="json")
-            json.dump(chat_json, f, indent=2)
-        logger.info("Saved chat to %s", chat_path)
-
-        # Update index
-        index = self._load_index()
-        index[chat.id] = {
-            "title": chat.title,
-            "created_at": chat.created_at.isoformat(),
-            "model": chat.model,
-        }
-        self._save_index(index)
-
-    def get_recent_chats(self, limit: int = 20) -> List[Dict]:
-        """Retrieve the most recent chats from the index"""
-        index = self._load_index()
+        # A direct save supersedes any pending debounced one. A
+        # timer that fired before the cancel may already be inside
+        # save_chat; _save_lock below serializes with it.
+        with self._pending_lock:
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+                self._pending_timer = None
+            self._pending_chat = None
+
+        # Messages live in an append-only JSONL file, one message
+        # per line, so saving mid-conversation appends only the
+        # messages added since the last save instead of rewriting
+        # the whole history. The index row records how many
+        # messages are on disk. If the in-memory history is
+        # shorter than the file (eg, a regenerate truncated it),
+        # fall back to a full rewrite.
+        chat_path = self.chats_dir / f"{chat.id}.jsonl"
+        with self._save_lock:
+            with self._db_lock:
+                row = self.db.execute(
+                    "SELECT message_count FROM chats WHERE id = ?",
+                    (chat.id,),
+                ).fetchone()
+            persisted = row[0] if row and row[0] is not None else 0
+            n = len(chat.messages)
+            if n < persisted or not chat_path.exists():
+                persisted = 0
+
+            lines = [
+                self._message_line(m) for m in chat.messages[persisted:]
+            ]
+            if persisted == 0:
+                data = "".join(lines)
+                self._submit_write(self._write_atomic, chat_path, data)
+                logger.info("Saving chat to %s", chat_path)
+            elif lines:
+                self._submit_write(
+                    self._append, chat_path, "".join(lines)
+                )
+                logger.info(
+                    "Appending %d messages to %s", len(lines), chat_path
+                )
+
+            # Update index; all chat metadata lives here. The FTS
+            # table follows the same incremental scheme as the JSONL
+            # file: append entries for new messages, rebuild from
+            # scratch on a rewrite.
+            searchable = [
+                (chat.id, m.message)
+                for m in chat.messages[persisted:]
+                if m.type in ("UserMessage", "AssistantMessage")
+            ]
+            with self._db_lock:
+                if persisted == 0:
+                    self.db.execute(
+                        "DELETE FROM chats_fts WHERE chat_id = ?",
+                        (chat.id,),
+                    )
+                if searchable:
+                    self.db.executemany(
+                        """
+                        INSERT INTO chats_fts (chat_id, content)
+                        VALUES (?, ?)
+                        """,
+                        searchable,
+                    )
+                self.db.execute(
+                    """
+                    INSERT OR REPLACE INTO chats
+                    (id, title, created_at, model, updated_at,
+                     export_location, input_tokens, output_tokens,
+                     message_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        chat.id,
+                        chat.title,
+                        chat.created_at.isoformat(),
+                        chat.model,
+                        chat.updated_at.isoformat(),
+                        str(chat.export_location)
+                        if chat.export_location
+                        else None,
+                        chat.input_tokens,
+                        chat.output_tokens,
+                        n,
+                    ),
+                )
+
+    def _message_line(self, m) -> str:
+        """Serialize one message as a JSONL line (with trailing
+        newline). pydantic-core serializes straight to JSON in
+        Rust; IncludedFiles take the slower dict path so their
+        payloads can be moved into the blob store."""
+        if isinstance(m, IncludedFile):
+            d = m.model_dump(mode="json")
+            self._extract_blob(d)
+            return json.dumps(d) + "\n"
+        return m.model_dump_json() + "\n"
+
+    def _extract_blob(self, m: Dict):
+        """
+        Replace an IncludedFile dict's data with a
+        content-addressed reference into the blobs dir, writing
+        the blob if new. Re-saving a chat then costs O(reference)
+        per file rather than rewriting the payload every time.
+        """
+        if m["type"] == "IncludedFile" and "blob" not in m:
+            data = m["data"].encode()
+            # Blobs are mostly text (markdown, code, base64) and
+            # compress well; the digest is of the uncompressed
+            # content so addresses stay stable.
+            h = hashlib.sha256(data).hexdigest()
+            blob_path = self.blobs_dir / h
+            if not blob_path.exists():
+                self._write_atomic(blob_path, zlib.compress(data, 6))
+            m["data"] = ""
+            m["blob"] = h
+
+    def _resolve_blob(self, m: Dict):
+        """Inverse of _extract_blob: load the file payload back"""
+        if m.get("type") == "IncludedFile" and "blob" in m:
+            raw = (self.blobs_dir / m.pop("blob")).read_bytes()
+            try:
+                raw = zlib.decompress(raw)
+            except zlib.error:
+                pass  # blob written before compression
+            m["data"] = raw.decode()
+
+    def _write_atomic(self, path: Path, data: str | bytes):
+        """Write data to a temp file and rename it into place,
+        so a crash mid-write can't corrupt the chat file."""
+        tmp = path.with_name(path.name + ".tmp")
+        mode = "wb" if isinstance(data, bytes) else "w"
+        with open(tmp, mode) as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _append(self, path: Path, data: str):
+        """Append pre-serialized JSONL lines to a chat file."""
+        with open(path, "a") as f:
+            f.write(data)
+
+    def _submit_write(self, fn, *args):
+        """Queue a file write on the background writer, falling
+        back to writing inline when the interpreter is exiting
+        (executors refuse new work during shutdown, and the
+        atexit flush may have a debounced save to land)."""
+        try:
+            self._writer.submit(fn, *args)
+        except RuntimeError:
+            fn(*args)
 
-        # Sort chats by creation date and limit the results
-        sorted_chats = sorted(
-            [{"id": k, **v} for k, v in index.items()],
-            key=lambda x: x["created_at"],
-            reverse=True,
-        )[:limit]
+    def get_recent_chats(
+        self, limit: int = 20, before: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Retrieve the most recently active chats from the index.
 
-        return sorted_chats
+        before is a paging cursor: pass the updated_at of the
+        last row of the previous page to fetch the next one. A
+        cursor keeps paging an index range scan, where a growing
+        OFFSET would rescan all the skipped rows.
+        """
+        q = """
+            SELECT id, title, created_at, updated_at, model
+            FROM chats
+            """
+        params: List = []
+        if before is not None:
+            q += "WHERE updated_at < ? "
+            params.append(before)
+        q += "ORDER BY updated_at DESC LIMIT ?"
+        params.append(limit)
+        with self._db_lock:
+            rows = self.db.execute(q, params).fetchall()
+
+        return [dict(r) for r in rows]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Full-text search across chat message text, best match
+        first. Returns the same metadata dicts as
+        get_recent_chats.
+        """
+        try:
+            with self._db_lock:
+                rows = self.db.execute(
+                    """
+                    SELECT c.id, c.title, c.created_at,
+                           c.updated_at, c.model
+                    FROM chats_fts f
+                    JOIN chats c ON c.id = f.chat_id
+                    WHERE chats_fts MATCH ?
+                    GROUP BY c.id
+                    ORDER BY min(f.rank) LIMIT ?
+                    """,
+                    (query, limit),
+                ).fetchall()
+        except sqlite3.OperationalError:
+            # User input isn't valid FTS query syntax (eg, an
+            # unbalanced quote); treat as no matches.
+            return []
+        return [dict(r) for r in rows]
 
     def get_chat(self, chat_id: str) -> Optional[Chat]:
-        """Retrieve a specific chat from its JSON file"""
+        """Retrieve a chat from the index and its JSONL file"""
+        # The index row is updated synchronously but file writes
+        # run on the background writer; drain it so we never read
+        # a file that is behind its message_count (a short read
+        # here would make the next save_chat rewrite the file from
+        # the stale copy, dropping the still-queued messages).
+        self.flush()
+        chat_path = self.chats_dir / f"{chat_id}.jsonl"
+        with self._db_lock:
+            row = self.db.execute(
+                """
+                SELECT title, model, created_at, updated_at,
+                       export_location, input_tokens, output_tokens
+                FROM chats WHERE id = ?
+                """,
+                (chat_id,),
+            ).fetchone()
+        if row is None or not chat_path.exists():
+            # Chats saved before the JSONL format, or whose index
+            # row was lost, still have a self-contained JSON file.
+            return self._get_chat_legacy(chat_id)
+
+        logger.info("Loading chat from %s", chat_path)
+        messages = []
+        with open(chat_path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                m = json.loads(line)
+                self._resolve_blob(m)
+                messages.append(m)
+
+        d = {
+            "id": chat_id,
+            "title": row[0],
+            "model": row[1],
+            "created_at": row[2],
+            "export_location": row[4],
+            "input_tokens": row[5] or 0,
+            "output_tokens": row[6] or 0,
+            "messages": messages,
+        }
+        if row[3] is not None:
+            d["updated_at"] = row[3]
+        return Chat.model_validate(d)
+
+    def _get_chat_legacy(self, chat_id: str) -> Optional[Chat]:
+        """Load a chat saved in the old single-JSON-file format"""
         chat_path = self.chats_dir / f"{chat_id}.json"
         try:
             logger.info("Loading chat from %s", chat_path)
             with open(chat_path, "r") as f:
-                d = json.load(f)
-                if "updated_at" not in d:
-                    d["updated_at"] = d["created_at"]
-                return Chat(**d)
+                raw = f.read()
+            if '"blob"' not in raw:  # fast path: no file payloads
+                return Chat.model_validate_json(raw)
+            d = json.loads(raw)
+            for m in d["messages"]:
+                self._resolve_blob(m)
+            return Chat.model_validate(d)
         except FileNotFoundError:
             return None
 
     def delete_chat(self, chat_id: str) -> bool:
-        """Delete a chat's JSON file and remove it from the index"""
-        chat_path = self.chats_dir / f"{chat_id}.json"
-
-        try:
-            # Find and delete any associated image files
-            chat_images = self.images_dir.glob(chat_id + "*")
-            for f in chat_images:
-                f.unlink()
-
-            # Delete the chat file
-            chat_path.unlink()
+        """Delete a chat's files and remove it from the index"""
+        # Find and delete any associated image files
+        chat_images = self.images_dir.glob(chat_id + "*")
+        for f in chat_images:
+            f.unlink(missing_ok=True)
+
+        # Delete the chat file (either format)
+        found = False
+        for suffix in (".jsonl", ".json"):
+            chat_path = self.chats_dir / f"{chat_id}{suffix}"
+            try:
+                chat_path.unlink()
+                found = True
+            except FileNotFoundError:
+                pass
 
-            # Remove from index
-            index = self._load_index()
-            if chat_id in index:
-                del index[chat_id]
-                self._save_index(index)
+        # Remove from index and search table
+        with self._db_lock:
+            self.db.execute("DELETE FROM chats WHERE id = ?", (chat_id,))
+            self.db.execute(
+                "DELETE FROM chats_fts WHERE chat_id = ?", (chat_id,)
+            )
 
-            return True
-        except FileNotFoundError:
-            return False
+        return found
 
     def clear_old_chats(self, days: int = 180) -> int:
         """
@@ -135,31 +537,39 @@ class ChatHistoryStore:
         """
         cutoff_date = datetime.now().date() - timedelta(days=days)
 
-        index = self._load_index()
-        chat_ids_to_delete = [
-            chat_id
-            for chat_id, data in index.items()
-            if datetime.fromisoformat(data["created_at"]).date()
-            < cutoff_date
-        ]
-
-        # Delete the files and update the index
-        deleted_count = 0
+        # created_at is stored ISO-8601, which compares
+        # lexicographically, so victims can be selected with a
+        # plain string comparison rather than parsing every
+        # timestamp into a datetime.
+        cutoff_iso = cutoff_date.isoformat()
+        with self._db_lock:
+            rows = self.db.execute(
+                "SELECT id FROM chats WHERE created_at < ?",
+                (cutoff_iso,),
+            ).fetchall()
+        chat_ids_to_delete = [r[0] for r in rows]
+
+        # Delete the files, then drop the rows in one statement
+        deleted_count = len(chat_ids_to_delete)
 
         for chat_id in chat_ids_to_delete:
-            try:
-                chat_images = self.images_dir.glob(chat_id + "*")
-                for f in chat_images:
-                    f.unlink()
-                chat_path = self.chats_dir / f"{chat_id}.json"
-                chat_path.unlink()
-            except FileNotFoundError:
-                pass
-            del index[chat_id]  # Update index
-            deleted_count += 1
+            for f in self.images_dir.glob(chat_id + "*"):
+                f.unlink(missing_ok=True)
+            for suffix in (".jsonl", ".json"):
+                (self.chats_dir / f"{chat_id}{suffix}").unlink(
+                    missing_ok=True
+                )
 
         if deleted_count > 0:
-            self._save_index(index)  # Save updated index
+            with self._db_lock:
+                self.db.executemany(
+                    "DELETE FROM chats_fts WHERE chat_id = ?",
+                    [(cid,) for cid in chat_ids_to_delete],
+                )
+                self.db.execute(
+                    "DELETE FROM chats WHERE created_at < ?",
+                    (cutoff_iso,),
+                )
 
         print(f"Cleared {deleted_count} old chats from before {cutoff_date}")
 
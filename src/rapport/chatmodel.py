@@ -5,10 +5,12 @@ Trying to keep this indepdent from streamlit.
 """
 
 from datetime import datetime
+from functools import cache
 from importlib import resources
+from itertools import count
 from pathlib import Path
 from typing import Union, List, Optional, Literal, Annotated, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from rapport.appconfig import ConfigStore
 
@@ -84,6 +86,16 @@ Message = Annotated[
 
 MessageList = List[Message]
 
+# Process-wide suffix for chat IDs; two chats created within the
+# same second would otherwise share an ID (and so a chat file).
+_chat_id_counter = count()
+
+
+def _new_chat_id() -> str:
+    """Generate a unique chat ID"""
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{ts}_{next(_chat_id_counter):04d}"
+
 
 class Chat(BaseModel):
     model: str
@@ -91,13 +103,20 @@ class Chat(BaseModel):
     created_at: datetime
     updated_at: datetime
     title: str = "New Chat"
-    id: str = Field(
-        default_factory=lambda: datetime.now().strftime("%Y%m%d_%H%M%S")
-    )
+    id: str = Field(default_factory=_new_chat_id)
     export_location: Optional[Path] = None
     input_tokens: int = 0
     output_tokens: int = 0
 
+    @model_validator(mode="before")
+    @classmethod
+    def _default_updated_at(cls, data):
+        # Chats saved before updated_at existed don't have the
+        # field; fall back to created_at.
+        if isinstance(data, dict) and "updated_at" not in data:
+            data["updated_at"] = data.get("created_at")
+        return data
+
 
 def new_chat(available_models: List[str], config_store: ConfigStore) -> Chat:
     """Initialise and return a new Chat"""
@@ -127,14 +146,18 @@ def new_chat(available_models: List[str], config_store: ConfigStore) -> Chat:
     )
 
 
-default_system_prompt = ""
-with resources.open_text("rapport", "systemprompt.md") as file:
-    default_system_prompt = file.read()
+@cache
+def default_system_prompt() -> str:
+    """Read the packaged default system prompt (once)"""
+    # Read lazily so importing this module doesn't block on disk;
+    # Streamlit re-imports on file-watcher-triggered reloads.
+    with resources.open_text("rapport", "systemprompt.md") as file:
+        return file.read()
 
 
 def get_system_message(extra_prompt=None):
     """Get system message, using custom prompt if provided"""
-    system_prompt = default_system_prompt.format(
+    system_prompt = default_system_prompt().format(
         extra_prompt=extra_prompt,
         current_date=datetime.now().strftime("%Y-%m-%d"),
     )
@@ -145,7 +168,3 @@ def get_system_message(extra_prompt=None):
     # ]
     # system_prompt = "\n\n".join(system_prompt)
     return SystemMessage(message=system_prompt)
-
-
-# Initialize with default system prompt
-SYSTEM = get_system_message()
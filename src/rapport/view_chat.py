@@ -3,7 +3,7 @@ import logging
 import shutil
 import subprocess
 import traceback
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable, List, Optional, cast
 
@@ -29,6 +29,10 @@ from rapport.chatmodel import (
 
 logger = logging.getLogger(__name__)
 
+# How many messages to render by default; "Load older messages"
+# widens the window by the same amount.
+RENDER_WINDOW = 50
+
 
 class State:
     chat: Chat
@@ -38,6 +42,8 @@ class State:
     models: List[str]
     finish_reason: FinishReason
     load_chat_with_id: Optional[str]
+    render_window: int
+    warmed_model: Optional[str]
 
 
 # _s acts as a typed accessor for session state.
@@ -117,6 +123,11 @@ def _handle_regenerate():
             case _:
                 break
     _s.chat.messages = st.session_state["chat"].messages[:-i]
+    # Persist the truncation before generation regrows the list:
+    # the store's incremental append keys off the saved message
+    # count, so an unsaved truncate-and-regrow would leave the
+    # old answer on disk (or interleave old and new messages).
+    appglobals.chatstore.save_chat(_s.chat)
     _s.generate_assistant = True
 
 
@@ -129,7 +140,7 @@ def _handle_submit_prompt():
         if file_ext in consts.IMAGE_FILE_EXTENSIONS:
             _insert_image_chat_message(f.getvalue(), f.name)
         else:
-            data = StringIO(f.getvalue().decode("utf-8")).read()
+            data = f.getvalue().decode("utf-8")
             ext = f.name.split(".")[-1]
             _insert_file_chat_message(data, f.name, ext)
 
@@ -189,9 +200,18 @@ def _insert_image_chat_message(data: bytes, fname: str):
     _s.chat.messages.append(IncludedImage(name=fname, path=fpath))
 
 
+def _warm_model():
+    """Ask the gateway to preload the active model (no-op for
+    providers that don't need it); once per model per session."""
+    if st.session_state.get("warmed_model") != _s.chat.model:
+        _s.warmed_model = _s.chat.model
+        appglobals.chatgateway.warm(_s.chat.model)
+
+
 def _handle_change_model():
     model = _s.model
     _s.chat.model = model
+    _warm_model()
 
     c = appglobals.configstore.load_config()
     c.last_used_model = model
@@ -231,24 +251,32 @@ def openai_math_markup(s: str) -> str:
 
 def generate_chat_title(chat: Chat) -> str:
     """Generate a title from the first few words of the first user message"""
-    # Find first user message
-    user_messages = [
-        msg for msg in chat.messages if isinstance(msg, UserMessage)
-    ]
-    if not user_messages:
+    # Find first user message; stop scanning at the first hit
+    # rather than collecting every user message in the chat.
+    first = next(
+        (m for m in chat.messages if isinstance(m, UserMessage)), None
+    )
+    if first is None:
         return chat.title  # return existing title if can't do better
 
-    # Take first line of user message
-    first_message = user_messages[0].message
-    title = first_message.split("\n")[0]
+    # Take first line of user message; maxsplit avoids building
+    # a list of every line of a long message just to keep one.
+    title = first.message.split("\n", 1)[0]
 
     return title
 
 
-def save_current_chat():
-    """Save the current chat session, writing to export file if set too."""
+def save_current_chat(debounce: bool = False):
+    """Save the current chat session, writing to export file if set too.
+
+    With debounce=True, the save is coalesced by the chat store;
+    use this for intermediate saves while a response is streaming.
+    """
     if len(_s.chat.messages) > 1:  # More than just system message
         _s.chat.title = generate_chat_title(_s.chat)
+        if debounce:
+            appglobals.chatstore.schedule_save(_s.chat)
+            return
         appglobals.chatstore.save_chat(_s.chat)
         if p := _s.chat.export_location:
             with open(p, "w") as f:
@@ -390,6 +418,8 @@ def init_state():
     # Really need to figure something better for state defaults
     if "load_chat_with_id" not in st.session_state:
         _s.load_chat_with_id = None
+    if "render_window" not in st.session_state:
+        _s.render_window = RENDER_WINDOW
     if chat_id := _s.load_chat_with_id:
         _s.load_chat_with_id = None
         _handle_load_chat(chat_id)
@@ -399,6 +429,9 @@ def init_state():
     if "chat" not in st.session_state:
         _s.chat = new_chat(_s.models, appglobals.configstore)
     _s.model = _s.chat.model
+    # Kick off a background model load so the first prompt of the
+    # session doesn't pay the load stall.
+    _warm_model()
 
 
 #
@@ -501,8 +534,25 @@ def render_sidebar():
         st.page_link(PAGE_HISTORY, label="More ->")
 
 
+def _handle_show_older():
+    _s.render_window += RENDER_WINDOW
+
+
 def render_chat_messages():
-    p = more_itertools.peekable(_s.chat.messages)
+    # Only render the tail of long conversations; every st.markdown
+    # here is rebuilt on each pane rerun, so rendering all of a
+    # long chat makes each streamed token cost O(history).
+    messages = _s.chat.messages
+    hidden = len(messages) - _s.render_window
+    if hidden > 0:
+        st.button(
+            f"Load older messages ({hidden} hidden)",
+            on_click=_handle_show_older,
+            type="tertiary",
+            icon=":material/history:",
+        )
+        messages = messages[-_s.render_window :]
+    p = more_itertools.peekable(messages)
     for message in p:
         # Use the type discriminator field to determine the message type
         match message.type:
@@ -649,22 +699,38 @@ def generate_assistant_message():
 
             tool_use = len(tool_acc) > 0
 
-            for tool_call in tool_acc:
+            # The model's tool calls within a turn are independent
+            # of each other, so execute them concurrently; results
+            # are collected in call order to keep the transcript
+            # deterministic.
+            futures = []
+            if tool_acc:
+                pool = ThreadPoolExecutor(
+                    max_workers=min(len(tool_acc), 8)
+                )
+                futures = [
+                    pool.submit(
+                        appglobals.toolregistry.execute_tool,
+                        tool_call.name,
+                        tool_call.parameters,
+                    )
+                    for tool_call in tool_acc
+                ]
+                pool.shutdown(wait=False)
+
+            for tool_call, future in zip(tool_acc, futures):
                 try:
                     result = ToolResultMessage(
                         id=tool_call.id,
                         name=tool_call.name,
-                        result=appglobals.toolregistry.execute_tool(
-                            tool_call.name,
-                            tool_call.parameters,
-                        ),
+                        result=future.result(),
                     )
                     _s.chat.messages.extend([tool_call, result])
                     _render_tool_call(tool_call, result)
                 except ValueError as ex:
                     logger.error("Error running tool:", ex)
 
-            save_current_chat()
+            save_current_chat(debounce=True)
 
             # If we have tool use, go around again
             if tool_use:
@@ -672,6 +738,8 @@ def generate_assistant_message():
             else:
                 break
 
+        save_current_chat()  # final durable save for the turn
+
 
 def render_assistant_message_footer():
     left, right = st.columns([3, 1])
@@ -713,17 +781,30 @@ def render_chat_input():
     )
 
 
+@st.fragment
+def render_chat_pane():
+    """
+    The chat pane: history, streaming response, footer and input.
+
+    Run as a fragment so interactions here (submitting a prompt,
+    regenerating) rerun only this pane rather than the whole
+    script; the sidebar is left out and reruns on full-script
+    passes only.
+    """
+    render_chat_messages()
+    if _s.generate_assistant:
+        _s.generate_assistant = False
+        generate_assistant_message()
+    if isinstance(_s.chat.messages[-1], AssistantMessage):
+        render_assistant_message_footer()
+    render_chat_input()
+
+
 def main():
     try:
         init_state()
         render_sidebar()
-        render_chat_messages()
-        if _s.generate_assistant:
-            _s.generate_assistant = False
-            generate_assistant_message()
-        if isinstance(_s.chat.messages[-1], AssistantMessage):
-            render_assistant_message_footer()
-        render_chat_input()
+        render_chat_pane()
     except Exception as e:
         print(e)
         print(traceback.format_exc())
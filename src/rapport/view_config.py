@@ -36,7 +36,7 @@ with st.form("settings_form"):
     with tab2:
         st.subheader("Custom system prompt")
         with st.expander("View default prompt"):
-            st.markdown(chatmodel.default_system_prompt)
+            st.markdown(chatmodel.default_system_prompt())
         custom_system_prompt = st.text_area(
             "Extra custom prompt to inject into system prompt:",
             value=config.custom_system_prompt or "",
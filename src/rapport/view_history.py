@@ -68,6 +68,13 @@ def handle_edit_dialog(chat_id, chat_title: str):
             st.rerun()
 
 
+PAGE_SIZE = 100
+
+
+def _handle_load_more(cursor):
+    st.session_state["history_cursors"].append(cursor)
+
+
 def main():
     st.html("""
         <style>
@@ -79,16 +86,51 @@ def main():
         """)
     st.title("History")
 
-    recent_chats = appglobals.chatstore.get_recent_chats(limit=100)
-    show_chat_history(recent_chats)
+    query = st.text_input(
+        "Search chats",
+        key="history_search",
+        icon=":material/search:",
+        label_visibility="collapsed",
+        placeholder="Search chats",
+    )
+    if query:
+        show_chat_history(appglobals.chatstore.search(query))
+        return
+
+    if "history_cursors" not in st.session_state:
+        st.session_state["history_cursors"] = []
+
+    # First page plus one page per stored cursor; each page is an
+    # index range scan keyed on updated_at, so paging deep into
+    # history doesn't rescan the rows above it.
+    pages = [appglobals.chatstore.get_recent_chats(limit=PAGE_SIZE)]
+    for cursor in st.session_state["history_cursors"]:
+        pages.append(
+            appglobals.chatstore.get_recent_chats(
+                limit=PAGE_SIZE, before=cursor
+            )
+        )
+    show_chat_history([c for page in pages for c in page])
+
+    last_page = pages[-1]
+    if len(last_page) == PAGE_SIZE:
+        st.button(
+            "Load more",
+            on_click=_handle_load_more,
+            args=(last_page[-1]["updated_at"],),
+            type="tertiary",
+            icon=":material/history:",
+        )
 
 
 def show_chat_history(recent_chats: List[Dict]):
+    # Chats arrive ordered by last activity; group headers use
+    # the same field so months appear once each.
     day = None
     for chat in recent_chats:
-        if day != chat["created_at"][:7]:
-            st.subheader(chat["created_at"][:7])
-            day = chat["created_at"][:7]
+        if day != chat["updated_at"][:7]:
+            st.subheader(chat["updated_at"][:7])
+            day = chat["updated_at"][:7]
 
         col1, col2, col3 = st.columns([5, 0.5, 0.5])
         with col1: